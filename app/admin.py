@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hmac
 import time
 
 from fastapi import APIRouter, Form, Request
@@ -14,6 +15,16 @@ from app.security import sign_dict, verify_signed_dict
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
 
+if settings.APP_ENV != "development":
+    # Skip the per-response mtime stat and keep compiled templates hot
+    # (Jinja's default 400-entry template cache is plenty for two pages).
+    templates.env.auto_reload = False
+    for _name in ("admin_login.html", "admin_dashboard.html"):
+        try:
+            templates.env.get_template(_name)
+        except Exception:
+            pass
+
 
 def _is_admin(request: Request) -> bool:
     tok = request.cookies.get("admin_session")
@@ -47,7 +58,8 @@ def admin_login(request: Request, password: str = Form(...)) -> HTMLResponse:
             {"request": request, "error": "ADMIN_PASSWORD is not set."},
             status_code=500,
         )
-    if password != settings.ADMIN_PASSWORD:
+    # Constant-time compare: plain != short-circuits and leaks prefix length via timing.
+    if not hmac.compare_digest(password.encode("utf-8"), settings.ADMIN_PASSWORD.encode("utf-8")):
         return templates.TemplateResponse(
             "admin_login.html",
             {"request": request, "error": "Wrong password."},
@@ -61,7 +73,7 @@ def admin_login(request: Request, password: str = Form(...)) -> HTMLResponse:
         cookie,
         httponly=True,
         samesite="lax",
-        secure=settings.PUBLIC_BASE_URL.startswith("https://"),
+        secure=settings.SECURE_COOKIES,
         max_age=60 * 60 * 12,
     )
     return resp
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
-from PIL import Image, ImageDraw, ImageFilter, ImageFont
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageOps
+
+from app.fonts import get_font as _font
 
 
 @dataclass(frozen=True)
@@ -36,6 +40,10 @@ BUILTIN_BACKGROUNDS: list[BackgroundDef] = [
     ),
 ]
 
+# Back-compat alias from an older copy of this module that named the list
+# BACKGROUNDS; keep it so external callers resolve against one module.
+BACKGROUNDS = BUILTIN_BACKGROUNDS
+
 
 def _images_dir() -> Path:
     # backgrounds.py lives in /app/app/backgrounds.py → project root is /app
@@ -67,18 +75,27 @@ def _human_name_from_filename(stem: str) -> str:
 
 _ALLOWED_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
 
+# (dir mtime_ns, id -> Path, defs) — rebuilt only when the images dir changes.
+_index_cache: tuple[int, dict[str, Path], list[BackgroundDef]] | None = None
 
-def file_backgrounds() -> list[BackgroundDef]:
-    """Load backgrounds from /images folder.
 
-    Each file becomes a background id based on filename.
+def _load_index() -> tuple[dict[str, Path], list[BackgroundDef]]:
+    """Scan the images dir once and cache the id→path table + defs.
+
+    The directory mtime is the cache key, so adding/removing files
+    invalidates while steady-state requests do a single stat().
     """
+    global _index_cache
     d = _images_dir()
     if not d.exists() or not d.is_dir():
-        return []
+        return {}, []
 
+    mtime_ns = d.stat().st_mtime_ns
+    if _index_cache is not None and _index_cache[0] == mtime_ns:
+        return _index_cache[1], _index_cache[2]
+
+    paths: dict[str, Path] = {}
     items: list[BackgroundDef] = []
-    seen: set[str] = set()
     for p in sorted(d.iterdir()):
         if not p.is_file():
             continue
@@ -88,10 +105,10 @@ def file_backgrounds() -> list[BackgroundDef]:
         # ensure unique ids
         base = bg_id
         i = 2
-        while bg_id in seen:
+        while bg_id in paths:
             bg_id = f"{base}-{i}"
             i += 1
-        seen.add(bg_id)
+        paths[bg_id] = p
         items.append(
             BackgroundDef(
                 id=bg_id,
@@ -99,7 +116,16 @@ def file_backgrounds() -> list[BackgroundDef]:
                 description="",
             )
         )
-    return items
+    _index_cache = (mtime_ns, paths, items)
+    return paths, items
+
+
+def file_backgrounds() -> list[BackgroundDef]:
+    """Load backgrounds from /images folder.
+
+    Each file becomes a background id based on filename.
+    """
+    return _load_index()[1]
 
 
 def list_backgrounds() -> list[BackgroundDef]:
@@ -108,21 +134,18 @@ def list_backgrounds() -> list[BackgroundDef]:
     return fb if fb else BUILTIN_BACKGROUNDS
 
 
-def _open_file_background(bg_id: str) -> Image.Image:
-    # Find the matching file by slugified stem.
-    d = _images_dir()
-    if not d.exists() or not d.is_dir():
+def _file_background_path(bg_id: str) -> Path:
+    p = _load_index()[0].get(bg_id)
+    if p is None:
         raise KeyError(f"Unknown background '{bg_id}'")
+    return p
 
-    matches: list[Path] = []
-    for p in d.iterdir():
-        if p.is_file() and p.suffix.lower() in _ALLOWED_EXTS and _slugify(p.stem) == bg_id:
-            matches.append(p)
-    if not matches:
-        raise KeyError(f"Unknown background '{bg_id}'")
-    # If duplicates exist, just pick the first by name.
-    p = sorted(matches)[0]
-    return Image.open(p).convert("RGB")
+
+@lru_cache(maxsize=16)
+def _file_background(path_str: str, size: tuple[int, int], mtime_ns: int) -> Image.Image:
+    # mtime_ns is part of the key so edits to the file invalidate the cache.
+    with Image.open(path_str) as src:
+        return _cover_resize(src.convert("RGBA"), size)
 
 
 def _cover_resize(img: Image.Image, size: tuple[int, int]) -> Image.Image:
@@ -142,51 +165,71 @@ def _cover_resize(img: Image.Image, size: tuple[int, int]) -> Image.Image:
     return resized.crop((left, top, left + tw, top + th))
 
 
-def _font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
-    # PIL default font is fine for server-side generated backgrounds.
-    try:
-        return ImageFont.truetype("DejaVuSans.ttf", size=size)
-    except Exception:
-        return ImageFont.load_default()
-
-
 def _linear_gradient(size: tuple[int, int], top: tuple[int, int, int], bottom: tuple[int, int, int]) -> Image.Image:
     w, h = size
-    base = Image.new("RGB", size, top)
-    draw = ImageDraw.Draw(base)
-    for y in range(h):
-        t = y / max(h - 1, 1)
-        col = (
-            int(top[0] * (1 - t) + bottom[0] * t),
-            int(top[1] * (1 - t) + bottom[1] * t),
-            int(top[2] * (1 - t) + bottom[2] * t),
-        )
-        draw.line([(0, y), (w, y)], fill=col)
-    return base
+    # One vectorized fill instead of h per-scanline draw calls.
+    t = np.linspace(0.0, 1.0, h, dtype=np.float32)[:, None]
+    col = (np.asarray(top, dtype=np.float32) * (1 - t) + np.asarray(bottom, dtype=np.float32) * t).astype(np.uint8)
+    arr = np.ascontiguousarray(np.broadcast_to(col[:, None, :], (h, w, 3)))
+    return Image.fromarray(arr, "RGB")
 
 
 def _radial_glow(size: tuple[int, int], center: tuple[int, int], inner: int, outer: int) -> Image.Image:
     w, h = size
-    glow = Image.new("L", size, color=0)
-    draw = ImageDraw.Draw(glow)
-    # Oversized ellipse for a soft vignette/glow.
-    r = max(w, h)
-    draw.ellipse((center[0] - r, center[1] - r, center[0] + r, center[1] + r), fill=255)
-    glow = glow.filter(ImageFilter.GaussianBlur(radius=max(w, h) / 6))
-    # Normalize levels roughly
-    return glow
+    # The glow shape is analytic (bright center falling off towards the
+    # edges), so compute a Gaussian falloff directly instead of drawing an
+    # oversized ellipse and blurring the whole canvas.
+    yy, xx = np.ogrid[:h, :w]
+    dx = (xx - center[0]).astype(np.float32)
+    dy = (yy - center[1]).astype(np.float32)
+    sigma = max(w, h) / 3.0
+    mask = (255.0 * np.exp(-(dx * dx + dy * dy) / (2.0 * sigma * sigma))).astype(np.uint8)
+    return Image.fromarray(mask, "L")
+
+
+@lru_cache(maxsize=8)
+def _studio_vignette(size: tuple[int, int]) -> Image.Image:
+    """Finished vignette mask for studio_neutral — pure function of size.
+
+    Uses a 256-entry LUT for the darkening (C fast path) instead of a
+    per-pixel Python lambda, and ImageOps.invert instead of Image.eval.
+    """
+    w, h = size
+    vign = _radial_glow(size, (w // 2, int(h * 0.35)), inner=240, outer=0)
+    vign = vign.point([min(255, int(i * 0.18)) for i in range(256)])
+    return ImageOps.invert(vign)
+
+
+def known_background(bg_id: str) -> bool:
+    """True if generate_background can resolve bg_id (file or built-in)."""
+    if bg_id in _load_index()[0]:
+        return True
+    return any(b.id == bg_id for b in BUILTIN_BACKGROUNDS)
 
 
 def generate_background(bg_id: str, size: tuple[int, int]) -> Image.Image:
+    """Return an RGBA background image for (bg_id, size).
+
+    RGBA throughout avoids the RGB round trip before render_composite's
+    alpha work. Results are cached (they are pure functions of the key);
+    callers get a copy so downstream paste/composite cannot mutate the
+    cached instance.
+    """
     w, h = size
     if w <= 0 or h <= 0:
         raise ValueError("Invalid background size")
 
     # Prefer backgrounds from /images folder if present.
-    fb = file_backgrounds()
-    if fb and any(b.id == bg_id for b in fb):
-        src = _open_file_background(bg_id)
-        return _cover_resize(src, size)
+    p = _load_index()[0].get(bg_id)
+    if p is not None:
+        return _file_background(str(p), size, p.stat().st_mtime_ns).copy()
+
+    return _build_background(bg_id, size).copy()
+
+
+@lru_cache(maxsize=64)
+def _build_background(bg_id: str, size: tuple[int, int]) -> Image.Image:
+    w, h = size
 
     if bg_id == "studio_neutral":
         sky = _linear_gradient(size, (245, 245, 246), (220, 220, 222))
@@ -195,10 +238,8 @@ def generate_background(bg_id: str, size: tuple[int, int]) -> Image.Image:
         img = sky
         img.paste(floor, (0, h - floor_h))
         # soft vignette
-        vign = _radial_glow(size, (w // 2, int(h * 0.35)), inner=240, outer=0)
-        vign = vign.point(lambda p: int(p * 0.18))
-        img = Image.composite(Image.new("RGB", size, (0, 0, 0)), img, Image.eval(vign, lambda p: 255 - p))
-        return img
+        img = Image.composite(Image.new("RGB", size, (0, 0, 0)), img, _studio_vignette(size))
+        return img.convert("RGBA")
 
     if bg_id == "outdoor_lot":
         sky_h = int(h * 0.58)
@@ -212,24 +253,27 @@ def generate_background(bg_id: str, size: tuple[int, int]) -> Image.Image:
         gdraw = ImageDraw.Draw(glow)
         gdraw.rectangle((0, sky_h - 30, w, sky_h + 40), fill=(255, 255, 255, 24))
         glow = glow.filter(ImageFilter.GaussianBlur(radius=18))
-        return Image.alpha_composite(img.convert("RGBA"), glow).convert("RGB")
+        return Image.alpha_composite(img.convert("RGBA"), glow)
 
     if bg_id == "branded_wall":
         base = _linear_gradient(size, (244, 244, 245), (228, 228, 230))
-        overlay = Image.new("RGBA", size, (0, 0, 0, 0))
-        d = ImageDraw.Draw(overlay)
         step = max(140, min(w, h) // 6)
         txt = "zhaku.eu"
         f = _font(max(16, step // 6))
-        for y in range(-step, h + step, step):
-            for x in range(-step, w + step, step):
-                d.text((x, y), txt, fill=(20, 20, 22, 18), font=f)
+        # Rasterize the text once into a single tile, then repeat it with
+        # np.tile instead of one ImageDraw.text call per grid cell.
+        tile = Image.new("RGBA", (step, step), (0, 0, 0, 0))
+        ImageDraw.Draw(tile).text((0, 0), txt, fill=(20, 20, 22, 18), font=f)
+        tarr = np.asarray(tile)
+        rows = -(-h // step) + 1
+        cols = -(-w // step) + 1
+        overlay = Image.fromarray(np.ascontiguousarray(np.tile(tarr, (rows, cols, 1))[:h, :w]), "RGBA")
         overlay = overlay.rotate(-18, resample=Image.Resampling.BICUBIC, expand=False)
         overlay = overlay.filter(ImageFilter.GaussianBlur(radius=0.6))
-        return Image.alpha_composite(base.convert("RGBA"), overlay).convert("RGB")
+        return Image.alpha_composite(base.convert("RGBA"), overlay)
 
     if bg_id == "gradient_silver":
-        return _linear_gradient(size, (250, 250, 252), (196, 198, 202))
+        return _linear_gradient(size, (250, 250, 252), (196, 198, 202)).convert("RGBA")
 
     raise KeyError(f"Unknown background '{bg_id}'")
 
@@ -22,6 +22,8 @@ class Settings:
     def __init__(self) -> None:
         self.APP_ENV: str = _env("APP_ENV", "development") or "development"
         self.PUBLIC_BASE_URL: str = _env("PUBLIC_BASE_URL", "http://localhost:8000") or "http://localhost:8000"
+        # Parsed once so cookie-setting paths don't re-scan the URL per request.
+        self.SECURE_COOKIES: bool = self.PUBLIC_BASE_URL.startswith("https://")
 
         self.APP_SECRET: str = _env("APP_SECRET", "") or ""
         self.ADMIN_PASSWORD: str = _env("ADMIN_PASSWORD", "") or ""
@@ -45,7 +47,13 @@ class Settings:
         default_model = "u2netp" if self.APP_ENV == "production" else "u2net"
         self.RMBG_MODEL: str = _env("RMBG_MODEL", default_model) or default_model
 
+        # Opt-in: load the rembg model at startup instead of on first job.
+        # Off by default — eager load can OOM the smallest containers.
+        self.PRELOAD_MODEL: bool = (_env("PRELOAD_MODEL", "0") or "0").lower() in ("1", "true", "yes")
+
         # Concurrency: keep low in production to avoid OOM on small containers.
+        # This sizes the in-process rembg/render thread pool; the number of
+        # ASGI workers is a separate knob (uvicorn's WEB_CONCURRENCY).
         default_workers = "1" if self.APP_ENV == "production" else "2"
         try:
             self.MAX_WORKERS: int = int(_env("MAX_WORKERS", default_workers) or default_workers)
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import queue
 import sqlite3
+import threading
 import time
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 
 SCHEMA = """
@@ -52,6 +55,15 @@ CREATE TABLE IF NOT EXISTS payments (
   FOREIGN KEY (client_token) REFERENCES clients(token)
 );
 
+CREATE INDEX IF NOT EXISTS idx_images_status ON images(status);
+CREATE INDEX IF NOT EXISTS idx_payments_status ON payments(status);
+
+-- Covering indexes for the per-render image-ownership join and for
+-- job_status's ORDER BY created_at.
+CREATE INDEX IF NOT EXISTS ix_jobs_id_token ON jobs(id, client_token);
+CREATE INDEX IF NOT EXISTS ix_images_id_job ON images(id, job_id, cutout_path, status);
+CREATE INDEX IF NOT EXISTS ix_images_job_created ON images(job_id, created_at);
+
 CREATE TABLE IF NOT EXISTS logs (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
   ts INTEGER NOT NULL,
@@ -59,78 +71,166 @@ CREATE TABLE IF NOT EXISTS logs (
   event TEXT NOT NULL,
   detail TEXT
 );
+
+CREATE INDEX IF NOT EXISTS idx_logs_ts_id ON logs(ts DESC, id DESC);
 """
 
 
 @dataclass
 class Db:
     path: Path
+    _local: threading.local = field(default_factory=threading.local, init=False, repr=False)
+    _wal_ready: bool = field(default=False, init=False, repr=False)
+    # WAL pattern: one serialized writer, many concurrent readers.
+    _writer: sqlite3.Connection | None = field(default=None, init=False, repr=False)
+    _writer_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _read_pool: queue.Queue = field(default_factory=lambda: queue.Queue(maxsize=8), init=False, repr=False)
+
+    def _configure(self, conn: sqlite3.Connection) -> None:
+        """Apply tuning PRAGMAs to a new connection.
+
+        WAL lets worker-thread status UPDATEs run without blocking request
+        reads; busy_timeout makes the rare remaining contention wait instead
+        of raising SQLITE_BUSY. journal_mode is persistent in the DB file,
+        so it only needs to run on the first connection.
+        """
+        if not self._wal_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._wal_ready = True
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-20000")
+        conn.execute("PRAGMA foreign_keys=ON")
 
     def connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
         conn.row_factory = sqlite3.Row
+        self._configure(conn)
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        """One long-lived connection per thread (avoids connect/close per call).
+
+        isolation_level=None puts sqlite3 in autocommit, so the simple
+        single-statement methods below need no explicit commit.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            self._configure(conn)
+            self._local.conn = conn
         return conn
 
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection from the pool.
+
+        Read-only connections can run concurrently with the writer under
+        WAL; the pool bounds how many we keep open.
+        """
+        try:
+            conn = self._read_pool.get_nowait()
+        except queue.Empty:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA busy_timeout=5000")
+        try:
+            yield conn
+        finally:
+            try:
+                self._read_pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """Run a write transaction on the single shared writer connection.
+
+        BEGIN IMMEDIATE takes the write lock upfront, avoiding the
+        deferred-transaction upgrade that surfaces as SQLITE_BUSY.
+        """
+        with self._writer_lock:
+            conn = self._writer
+            if conn is None:
+                conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, cached_statements=256)
+                conn.row_factory = sqlite3.Row
+                self._configure(conn)
+                self._writer = conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
     def init(self) -> None:
         self.path.parent.mkdir(parents=True, exist_ok=True)
         with self.connect() as conn:
             conn.executescript(SCHEMA)
+            # Refresh planner statistics so the covering indexes get picked.
+            conn.execute("ANALYZE")
             conn.commit()
 
     def log(self, level: str, event: str, detail: str | None = None) -> None:
-        with self.connect() as conn:
-            conn.execute(
-                "INSERT INTO logs(ts, level, event, detail) VALUES(?,?,?,?)",
-                (int(time.time()), level, event, detail),
-            )
-            conn.commit()
+        self._conn().execute(
+            "INSERT INTO logs(ts, level, event, detail) VALUES(?,?,?,?)",
+            (int(time.time()), level, event, detail),
+        )
 
     def upsert_client(self, token: str) -> None:
         now = int(time.time())
-        with self.connect() as conn:
-            conn.execute(
-                """
-                INSERT INTO clients(token, created_at, last_seen_at)
-                VALUES(?,?,?)
-                ON CONFLICT(token) DO UPDATE SET last_seen_at=excluded.last_seen_at
-                """,
-                (token, now, now),
-            )
-            conn.commit()
+        self._conn().execute(
+            """
+            INSERT INTO clients(token, created_at, last_seen_at)
+            VALUES(?,?,?)
+            ON CONFLICT(token) DO UPDATE SET last_seen_at=excluded.last_seen_at
+            """,
+            (token, now, now),
+        )
 
     def set_paid(self, token: str, stripe_customer_id: str | None = None) -> None:
         now = int(time.time())
-        with self.connect() as conn:
-            conn.execute(
-                "UPDATE clients SET paid=1, paid_at=?, stripe_customer_id=COALESCE(?, stripe_customer_id) WHERE token=?",
-                (now, stripe_customer_id, token),
-            )
-            conn.commit()
+        self._conn().execute(
+            "UPDATE clients SET paid=1, paid_at=?, stripe_customer_id=COALESCE(?, stripe_customer_id) WHERE token=?",
+            (now, stripe_customer_id, token),
+        )
 
     def get_client(self, token: str) -> dict[str, Any] | None:
-        with self.connect() as conn:
-            row = conn.execute("SELECT * FROM clients WHERE token=?", (token,)).fetchone()
-            return dict(row) if row else None
+        row = self._conn().execute("SELECT * FROM clients WHERE token=?", (token,)).fetchone()
+        return dict(row) if row else None
 
     def stats(self) -> dict[str, Any]:
-        with self.connect() as conn:
-            uploads = conn.execute("SELECT COUNT(*) AS c FROM images").fetchone()["c"]
-            processed = conn.execute("SELECT COUNT(*) AS c FROM images WHERE status='ready'").fetchone()["c"]
-            payments = conn.execute("SELECT COUNT(*) AS c FROM payments WHERE status='paid'").fetchone()["c"]
-            revenue_chf_centimes = conn.execute(
-                "SELECT COALESCE(SUM(amount_chf_centimes), 0) AS s FROM payments WHERE status='paid'"
-            ).fetchone()["s"]
-            watermark_removals = conn.execute("SELECT COUNT(*) AS c FROM clients WHERE paid=1").fetchone()["c"]
-            return {
-                "uploads": uploads,
-                "processed": processed,
-                "payments": payments,
-                "revenue_chf_centimes": revenue_chf_centimes,
-                "watermark_removals": watermark_removals,
-            }
+        # One pass over each table via conditional aggregates instead of
+        # five separate COUNT queries.
+        conn = self._conn()
+        images = conn.execute(
+            "SELECT COUNT(*) AS uploads, COALESCE(SUM(CASE WHEN status='ready' THEN 1 ELSE 0 END), 0) AS processed FROM images"
+        ).fetchone()
+        pays = conn.execute(
+            """
+            SELECT COUNT(*) FILTER (WHERE status='paid') AS payments,
+                   COALESCE(SUM(CASE WHEN status='paid' THEN amount_chf_centimes END), 0) AS revenue
+            FROM payments
+            """
+        ).fetchone()
+        watermark_removals = conn.execute("SELECT COUNT(*) AS c FROM clients WHERE paid=1").fetchone()["c"]
+        return {
+            "uploads": images["uploads"],
+            "processed": images["processed"],
+            "payments": pays["payments"],
+            "revenue_chf_centimes": pays["revenue"],
+            "watermark_removals": watermark_removals,
+        }
 
     def recent_logs(self, limit: int = 200) -> list[dict[str, Any]]:
-        with self.connect() as conn:
-            rows = conn.execute("SELECT * FROM logs ORDER BY ts DESC, id DESC LIMIT ?", (limit,)).fetchall()
-            return [dict(r) for r in rows]
+        # idx_logs_ts_id matches this ORDER BY, so the query is a 200-row
+        # index walk that stops at the LIMIT - no sort, no full scan.
+        rows = self._conn().execute(
+            "SELECT * FROM logs ORDER BY ts DESC, id DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [dict(r) for r in rows]
 
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+from PIL import ImageFont
+
+
+@lru_cache(maxsize=32)
+def get_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    """Shared font loader for generated backgrounds and watermarks.
+
+    Cached per size so the TTF is parsed once instead of per render;
+    FreeTypeFont is safe to share for read-only text rendering.
+    """
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size=size)
+    except Exception:
+        return ImageFont.load_default()
@@ -1,18 +1,25 @@
 from __future__ import annotations
 
+import asyncio
 import io
 import json
+import os
+import threading
 import time
 import uuid
 import zipfile
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+
+import aiofiles
 
 # Resolve paths from this file so app works from any cwd (local + Docker).
 _BASE_DIR = Path(__file__).resolve().parent.parent
 _STATIC_DIR = _BASE_DIR / "app" / "static"
 _INDEX_HTML = _STATIC_DIR / "index.html"
+# Pre-rendered background thumbnails, served as plain static files.
+_THUMBS_DIR = _STATIC_DIR / "bg_thumbs"
 
 from fastapi import BackgroundTasks, FastAPI, File, Form, HTTPException, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
@@ -21,13 +28,13 @@ from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 
 from app.admin import router as admin_router
-from app.backgrounds import generate_background, list_backgrounds
+from app.backgrounds import generate_background, known_background, list_backgrounds
 from app.config import settings
 from app.db import Db
 from app.image_processing import RenderParams, clamp_preview, encode_image, render_composite
 from app.storage import cutouts_dir, db_path, ensure_dirs, originals_dir, safe_filename
 from app.stripe_payments import create_checkout_session, handle_webhook, stripe_configured, sync_payment_from_session
-from app.worker import remove_background_to_file
+from app.worker import png_size, preload_session, remove_background_to_file
 
 
 app = FastAPI(title="Car Photo Processor", version="1.0.0")
@@ -52,24 +59,170 @@ app.include_router(admin_router)
 app.mount("/static", StaticFiles(directory=str(_STATIC_DIR)), name="static")
 
 
+# Hot-path SQL as shared constants: identical strings hit sqlite3's
+# prepared-statement cache (sized via cached_statements in app.db).
+_SQL_LOAD_ORIGINAL = """
+    SELECT i.original_path FROM images i
+    JOIN jobs j ON j.id = i.job_id
+    WHERE i.id=? AND j.client_token=?
+"""
+_SQL_LOAD_CUTOUT = """
+    SELECT i.cutout_path, i.status FROM images i
+    JOIN jobs j ON j.id = i.job_id
+    WHERE i.id=? AND j.client_token=?
+"""
+_SQL_PENDING_COUNT = "SELECT COUNT(*) FROM images WHERE job_id=? AND status NOT IN ('ready','error')"
+
+
+class _ImageFileResponse(FileResponse):
+    """FileResponse tuned for multi-MB originals/cutouts.
+
+    1 MiB chunks cut the per-chunk event-loop round trips ~16x versus the
+    64 KiB default. When the ASGI server advertises the pathsend/zero-copy
+    extension, Starlette's FileResponse hands the kernel the file path
+    directly (sendfile) and the chunk size is moot.
+    """
+
+    chunk_size = 1024 * 1024
+
+
+class _RenderCache:
+    """Short-lived TTL cache for encoded render output bytes.
+
+    Preview-then-download with the same slider settings is the common flow,
+    so the second request should be a dict lookup rather than a full
+    render+encode. Per-key locks coalesce concurrent identical renders so
+    the pipeline runs once. Entries are whole encoded images (multi-MB at
+    full size), hence the small maxsize.
+    """
+
+    def __init__(self, maxsize: int = 32, ttl: float = 120.0) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: dict[tuple, tuple[float, bytes]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: dict[tuple, threading.Lock] = {}
+
+    def get(self, key: tuple) -> bytes | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, data = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            return data
+
+    def put(self, key: tuple, data: bytes) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._data[key] = (now + self._ttl, data)
+            if len(self._data) > self._maxsize:
+                # Drop expired entries first, then oldest-inserted (dicts
+                # keep insertion order).
+                for k in [k for k, (exp, _) in self._data.items() if exp < now]:
+                    del self._data[k]
+                while len(self._data) > self._maxsize:
+                    del self._data[next(iter(self._data))]
+
+    def fetch(self, key: tuple, produce: Callable[[], bytes]) -> bytes:
+        data = self.get(key)
+        if data is not None:
+            return data
+        with self._lock:
+            klock = self._key_locks.setdefault(key, threading.Lock())
+            if len(self._key_locks) > 256:
+                self._key_locks = {key: klock}
+        with klock:
+            data = self.get(key)
+            if data is None:
+                data = produce()
+                self.put(key, data)
+            return data
+
+
+def _render_key(kind: str, image_id: str, bg_id: str, rotate: float, scale: float, x: float, y: float, shadow: bool, snap: bool, fmt: str, paid: bool) -> tuple:
+    # snap_center makes render_composite ignore the offsets, so any
+    # (snap=True, x, y) renders the same pixels as (snap=False, 0, 0) -
+    # canonicalize so those keys collide (the frontend previews with
+    # snap=true but downloads with snap=false and zeroed sliders).
+    if snap:
+        snap, x, y = False, 0.0, 0.0
+    # Slider values get rounded so float jitter from the client doesn't
+    # defeat the cache.
+    return (kind, image_id, bg_id, round(rotate, 3), round(scale, 4), round(x, 2), round(y, 2), bool(shadow), bool(snap), fmt.lower(), paid)
+
+
 def _require_secret() -> None:
     if settings.APP_ENV != "development" and not settings.APP_SECRET:
         raise RuntimeError("APP_SECRET must be set")
 
 
 @app.on_event("startup")
-def _startup() -> None:
+async def _startup() -> None:
     ensure_dirs()
     _require_secret()
     db = Db(path=db_path())
     db.init()
     app.state.db = db
+    # Captured so worker threads can publish job events onto the loop.
+    app.state.loop = asyncio.get_running_loop()
+    app.state.job_events = {}
     app.state.executor = ThreadPoolExecutor(max_workers=max(1, int(getattr(settings, "MAX_WORKERS", 1) or 1)))
-    # Rembg model session is loaded lazily on first job (prevents slow/OOM startup on small containers).
+    # Rembg model session is loaded lazily on first job (prevents slow/OOM startup on small containers),
+    # unless PRELOAD_MODEL opts into warming it here so the first job skips the load.
+    app.state.render_cache = _RenderCache(maxsize=32, ttl=120.0)
     app.state.rembg_session = None
+    if settings.PRELOAD_MODEL:
+        app.state.executor.submit(_preload_model)
+    # Warm the background caches off-thread so the first render request
+    # doesn't pay generation cost; best-effort only.
+    app.state.executor.submit(_warm_backgrounds)
     db.log("info", "app.start", f"env={settings.APP_ENV} workers={getattr(settings, 'MAX_WORKERS', 1)} model={settings.RMBG_MODEL}")
 
 
+def _publish_job_event(job_id: str, payload: dict[str, Any]) -> None:
+    """Push a worker-side status change to any SSE subscribers for the job.
+
+    Called from executor threads, so the queue handoff goes through
+    call_soon_threadsafe onto the server's event loop. No subscribers is
+    the common case (polling clients) and costs one dict lookup.
+    """
+    queues: set[asyncio.Queue] | None = app.state.job_events.get(job_id)
+    loop: asyncio.AbstractEventLoop | None = getattr(app.state, "loop", None)
+    if not queues or loop is None:
+        return
+    for q in list(queues):
+        loop.call_soon_threadsafe(q.put_nowait, payload)
+
+
+def _preload_model() -> None:
+    try:
+        app.state.rembg_session = preload_session()
+        app.state.db.log("info", "app.model_ready", f"model={settings.RMBG_MODEL}")
+    except Exception as e:
+        app.state.db.log("error", "app.model_preload_failed", f"{e}")
+
+
+def _warm_backgrounds() -> None:
+    try:
+        _THUMBS_DIR.mkdir(parents=True, exist_ok=True)
+        for b in list_backgrounds():
+            generate_background(b.id, (1920, 1080))
+            # Dump the catalog thumbnail once; afterwards the browser gets a
+            # cacheable static file instead of a per-request Pillow render.
+            # Temp name + atomic rename: the exists() guard would otherwise
+            # pin a partial file forever if startup died mid-write.
+            p = _THUMBS_DIR / f"{b.id}.png"
+            if not p.exists():
+                tmp = p.with_name(p.name + ".tmp")
+                tmp.write_bytes(encode_image(generate_background(b.id, (900, 560)), "png"))
+                os.replace(tmp, p)
+    except Exception:
+        pass
+
+
 @app.get("/", response_class=HTMLResponse)
 def index() -> FileResponse:
     return FileResponse(str(_INDEX_HTML))
@@ -121,7 +274,7 @@ def register_client(request: Request, body: RegisterClientIn) -> JSONResponse:
         body.token,
         httponly=True,
         samesite="lax",
-        secure=settings.PUBLIC_BASE_URL.startswith("https://"),
+        secure=settings.SECURE_COOKIES,
         max_age=60 * 60 * 24 * 365,
     )
     return resp
@@ -140,15 +293,23 @@ def me(request: Request) -> dict[str, Any]:
     }
 
 
+def _thumb_url(bg_id: str) -> str:
+    # Prefer the pre-rendered static thumbnail (sendfile + browser caching);
+    # fall back to the render route until the warm task has produced it.
+    if (_THUMBS_DIR / f"{bg_id}.png").exists():
+        return f"/static/bg_thumbs/{bg_id}.png"
+    return f"/api/backgrounds/{bg_id}/thumb.png"
+
+
 @app.get("/api/backgrounds")
-def list_backgrounds() -> dict[str, Any]:
+def api_list_backgrounds() -> dict[str, Any]:
     return {
         "backgrounds": [
             {
                 "id": b.id,
                 "name": b.name,
                 "description": b.description,
-                "thumb_url": f"/api/backgrounds/{b.id}/thumb.png",
+                "thumb_url": _thumb_url(b.id),
             }
             for b in list_backgrounds()
         ]
@@ -157,13 +318,11 @@ def list_backgrounds() -> dict[str, Any]:
 
 @app.get("/api/backgrounds/{bg_id}/thumb.png")
 def background_thumb(bg_id: str) -> Response:
-    from PIL import Image
-
     try:
         img = generate_background(bg_id, (900, 560))
     except KeyError:
         raise HTTPException(status_code=404, detail="Unknown background")
-    out = encode_image(img.convert("RGBA"), "png")
+    out = encode_image(img, "png")
     return Response(content=out, media_type="image/png")
 
 
@@ -186,10 +345,11 @@ async def create_job(request: Request, files: list[UploadFile] = File(...)) -> A
 
     job_id = str(uuid.uuid4())
     now = int(time.time())
-    with db.connect() as conn:
-        conn.execute("INSERT INTO jobs(id, client_token, created_at) VALUES(?,?,?)", (job_id, tok, now))
-        conn.commit()
 
+    # Stream all uploads to disk first (no DB work in this loop), then insert
+    # job + image rows in one transaction: one fsync per job instead of one
+    # per file. Rows start at 'processing' since work is submitted right away.
+    rows: list[tuple[str, str, str, int, str, str, str]] = []
     results: list[dict[str, Any]] = []
     for f in files:
         image_id = str(uuid.uuid4())
@@ -197,60 +357,61 @@ async def create_job(request: Request, files: list[UploadFile] = File(...)) -> A
         original_path = originals_dir() / f"{image_id}_{fname}"
         cutout_path = cutouts_dir() / f"{image_id}.png"
 
-        # Stream upload to disk (avoid reading full file into RAM on Railway)
+        # Stream upload to disk (avoid reading full file into RAM on Railway).
+        # aiofiles keeps the blocking write syscalls off the event loop so
+        # concurrent polls stay responsive during big uploads.
         await f.seek(0)
-        with original_path.open("wb") as out:
+        async with aiofiles.open(original_path, "wb") as out:
             while True:
-                chunk = await f.read(1024 * 1024)
+                chunk = await f.read(4 * 1024 * 1024)
                 if not chunk:
                     break
-                out.write(chunk)
-
-        with db.connect() as conn:
-            conn.execute(
-                """
-                INSERT INTO images(id, job_id, filename, created_at, status, original_path, cutout_path)
-                VALUES(?,?,?,?,?,?,?)
-                """,
-                (image_id, job_id, fname, now, "queued", str(original_path), str(cutout_path)),
-            )
-            conn.commit()
+                await out.write(chunk)
 
+        rows.append((image_id, job_id, fname, now, "processing", str(original_path), str(cutout_path)))
         results.append(
             {
                 "id": image_id,
                 "filename": fname,
-                "status": "queued",
+                "status": "processing",
                 "original_url": f"/api/images/{image_id}/original",
                 "cutout_url": f"/api/images/{image_id}/cutout.png",
             }
         )
 
-        def _mark_processing(img_id: str = image_id) -> None:
-            with db.connect() as conn:
-                conn.execute("UPDATE images SET status='processing' WHERE id=?", (img_id,))
-                conn.commit()
+    with db.write() as conn:
+        conn.execute("INSERT INTO jobs(id, client_token, created_at) VALUES(?,?,?)", (job_id, tok, now))
+        conn.executemany(
+            """
+            INSERT INTO images(id, job_id, filename, created_at, status, original_path, cutout_path)
+            VALUES(?,?,?,?,?,?,?)
+            """,
+            rows,
+        )
+
+    for image_id, _job, _fname, _ts, _status, original, cutout in rows:
 
         def _on_success(width: int, height: int, img_id: str = image_id) -> None:
-            with db.connect() as conn:
+            with db.write() as conn:
                 conn.execute(
                     "UPDATE images SET status='ready', width=?, height=?, error=NULL WHERE id=?",
                     (width, height, img_id),
                 )
-                conn.commit()
+                remaining = conn.execute(_SQL_PENDING_COUNT, (job_id,)).fetchone()[0]
             db.log("info", "image.ready", f"image={img_id} {width}x{height}")
+            _publish_job_event(job_id, {"image_id": img_id, "status": "ready", "width": width, "height": height, "remaining": remaining})
 
         def _on_error(detail: str, img_id: str = image_id) -> None:
-            with db.connect() as conn:
+            with db.write() as conn:
                 conn.execute("UPDATE images SET status='error', error=? WHERE id=?", (detail, img_id))
-                conn.commit()
+                remaining = conn.execute(_SQL_PENDING_COUNT, (job_id,)).fetchone()[0]
             db.log("error", "image.error", f"image={img_id}\n{detail}")
+            _publish_job_event(job_id, {"image_id": img_id, "status": "error", "error": detail, "remaining": remaining})
 
-        _mark_processing()
         request.app.state.executor.submit(
             remove_background_to_file,
-            original_path=original_path,
-            cutout_path=cutout_path,
+            original_path=Path(original),
+            cutout_path=Path(cutout),
             session=request.app.state.rembg_session,
             on_error=_on_error,
             on_success=_on_success,
@@ -267,7 +428,7 @@ def job_status(request: Request, job_id: str) -> dict[str, Any]:
     if not tok:
         raise HTTPException(status_code=401, detail="Missing client token")
 
-    with db.connect() as conn:
+    with db.read() as conn:
         job = conn.execute("SELECT * FROM jobs WHERE id=? AND client_token=?", (job_id, tok)).fetchone()
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
@@ -291,24 +452,81 @@ def job_status(request: Request, job_id: str) -> dict[str, Any]:
     return {"job_id": job_id, "images": images}
 
 
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(request: Request, job_id: str) -> StreamingResponse:
+    """Server-sent-events stream of per-image status changes for a job.
+
+    Replaces once-a-second polling of /api/jobs/{job_id}: the worker's
+    completion callbacks push events here, so the client hears about a
+    finished image immediately and with one long-lived request instead of
+    N polls. The polling endpoint stays for compatibility.
+    """
+    db: Db = request.app.state.db
+    tok = _client_token(request)
+    if not tok:
+        raise HTTPException(status_code=401, detail="Missing client token")
+
+    with db.read() as conn:
+        job = conn.execute("SELECT id FROM jobs WHERE id=? AND client_token=?", (job_id, tok)).fetchone()
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+
+    # Subscribe before snapshotting: a snapshot taken before the queue is
+    # registered would race the workers (an image finishing in between lands
+    # in neither). Taken after, an image may show up both in the snapshot
+    # and as an event; duplicates are harmless to the client, missed finals
+    # are not.
+    q: asyncio.Queue = asyncio.Queue()
+    queues: set[asyncio.Queue] = request.app.state.job_events.setdefault(job_id, set())
+    queues.add(q)
+
+    with db.read() as conn:
+        imgs = conn.execute(
+            "SELECT id, status, error, width, height FROM images WHERE job_id=? ORDER BY created_at ASC", (job_id,)
+        ).fetchall()
+    pending_ids = {r["id"] for r in imgs if r["status"] not in ("ready", "error")}
+    snapshot = [
+        {"image_id": r["id"], "status": r["status"], "error": r["error"], "width": r["width"], "height": r["height"], "remaining": len(pending_ids)}
+        for r in imgs
+        if r["status"] in ("ready", "error")
+    ]
+
+    async def _stream():
+        try:
+            for msg in snapshot:
+                yield f"data: {json.dumps(msg)}\n\n"
+            # Track termination by image id, not by counting events: an image
+            # that appears both in the snapshot and as a queued duplicate must
+            # not decrement twice.
+            while pending_ids:
+                try:
+                    msg = await asyncio.wait_for(q.get(), timeout=15.0)
+                except asyncio.TimeoutError:
+                    # SSE comment as keep-alive so proxies don't cut the idle stream.
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {json.dumps(msg)}\n\n"
+                pending_ids.discard(msg.get("image_id"))
+        finally:
+            queues.discard(q)
+            if not queues:
+                request.app.state.job_events.pop(job_id, None)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(_stream(), media_type="text/event-stream", headers=headers)
+
+
 @app.get("/api/images/{image_id}/original")
 def get_original(request: Request, image_id: str) -> FileResponse:
     db: Db = request.app.state.db
     tok = _client_token(request)
     if not tok:
         raise HTTPException(status_code=401, detail="Missing client token")
-    with db.connect() as conn:
-        row = conn.execute(
-            """
-            SELECT i.original_path FROM images i
-            JOIN jobs j ON j.id = i.job_id
-            WHERE i.id=? AND j.client_token=?
-            """,
-            (image_id, tok),
-        ).fetchone()
+    with db.read() as conn:
+        row = conn.execute(_SQL_LOAD_ORIGINAL, (image_id, tok)).fetchone()
     if not row:
         raise HTTPException(status_code=404, detail="Not found")
-    return FileResponse(row["original_path"])
+    return _ImageFileResponse(row["original_path"])
 
 
 @app.get("/api/images/{image_id}/cutout.png")
@@ -317,32 +535,28 @@ def get_cutout(request: Request, image_id: str) -> FileResponse:
     tok = _client_token(request)
     if not tok:
         raise HTTPException(status_code=401, detail="Missing client token")
-    with db.connect() as conn:
-        row = conn.execute(
-            """
-            SELECT i.cutout_path, i.status FROM images i
-            JOIN jobs j ON j.id = i.job_id
-            WHERE i.id=? AND j.client_token=?
-            """,
-            (image_id, tok),
-        ).fetchone()
+    with db.read() as conn:
+        row = conn.execute(_SQL_LOAD_CUTOUT, (image_id, tok)).fetchone()
     if not row:
         raise HTTPException(status_code=404, detail="Not found")
     if row["status"] != "ready":
         raise HTTPException(status_code=409, detail=f"Cutout not ready (status={row['status']})")
-    return FileResponse(row["cutout_path"], media_type="image/png")
+    return _ImageFileResponse(row["cutout_path"], media_type="image/png")
+
+
+def _peek_cutout_size(path: Path) -> tuple[int, int] | None:
+    """Read a cutout's dimensions from its PNG IHDR header (first 26 bytes)
+    without involving PIL at all."""
+    try:
+        with open(path, "rb") as f:
+            return png_size(f.read(26))
+    except OSError:
+        return None
 
 
 def _load_cutout(db: Db, tok: str, image_id: str) -> Path:
-    with db.connect() as conn:
-        row = conn.execute(
-            """
-            SELECT i.cutout_path, i.status FROM images i
-            JOIN jobs j ON j.id = i.job_id
-            WHERE i.id=? AND j.client_token=?
-            """,
-            (image_id, tok),
-        ).fetchone()
+    with db.read() as conn:
+        row = conn.execute(_SQL_LOAD_CUTOUT, (image_id, tok)).fetchone()
     if not row:
         raise HTTPException(status_code=404, detail="Image not found")
     if row["status"] != "ready":
@@ -369,18 +583,43 @@ def render_preview(
 
     db: Db = request.app.state.db
     cutout_path = _load_cutout(db, tok, image_id)
-
-    from PIL import Image
-
-    with Image.open(cutout_path) as car:
-        car = car.convert("RGBA")
-        bg = generate_background(bg_id, car.size)
-        params = RenderParams(rotate_deg=rotate, scale=scale, offset_x=x, offset_y=y, shadow=shadow, snap_center=snap)
-        out = render_composite(car, bg, params, paid=_paid(request))
-        out = clamp_preview(out, max_dim=1200)
-        data = encode_image(out, fmt)
-        media = "image/png" if fmt.lower() == "png" else "image/jpeg"
-        return Response(content=data, media_type=media)
+    paid = _paid(request)
+    params = RenderParams(rotate_deg=rotate, scale=scale, offset_x=x, offset_y=y, shadow=shadow, snap_center=snap)
+    cache: _RenderCache = request.app.state.render_cache
+    key = _render_key("preview", image_id, bg_id, rotate, scale, x, y, shadow, snap, fmt, paid)
+
+    def _produce() -> bytes:
+        from PIL import Image
+
+        # Size comes from the PNG header, so the (usually cached) background
+        # is resolved before any cutout pixels get decoded.
+        size = _peek_cutout_size(cutout_path)
+        with Image.open(cutout_path) as car:
+            bg = generate_background(bg_id, size or car.size)
+            car = car.convert("RGBA")
+            out = render_composite(car, bg, params, paid=paid)
+            # Users usually download with the settings they just previewed;
+            # stash the full-size bytes so that download is a cache hit.
+            # Default encoder settings, not fast: a warm download must be
+            # byte-identical to a cold one. The encode runs on the worker
+            # pool - a full-size optimize=True pass is the most expensive
+            # step here and must not delay the interactive preview.
+            dl_key = _render_key("download", image_id, bg_id, rotate, scale, x, y, shadow, snap, fmt, paid)
+            if cache.get(dl_key) is None:
+
+                def _warm(img: Any = out) -> None:
+                    try:
+                        if cache.get(dl_key) is None:
+                            cache.put(dl_key, encode_image(img, fmt))
+                    except Exception:
+                        pass
+
+                request.app.state.executor.submit(_warm)
+            return encode_image(clamp_preview(out, max_dim=1200), fmt, fast=True)
+
+    data = cache.fetch(key, _produce)
+    media = "image/png" if fmt.lower() == "png" else "image/jpeg"
+    return Response(content=data, media_type=media)
 
 
 @app.get("/api/render/download")
@@ -402,16 +641,22 @@ def render_download(
 
     db: Db = request.app.state.db
     cutout_path = _load_cutout(db, tok, image_id)
+    paid = _paid(request)
+    params = RenderParams(rotate_deg=rotate, scale=scale, offset_x=x, offset_y=y, shadow=shadow, snap_center=snap)
+    cache: _RenderCache = request.app.state.render_cache
+    key = _render_key("download", image_id, bg_id, rotate, scale, x, y, shadow, snap, fmt, paid)
 
-    from PIL import Image
+    def _produce() -> bytes:
+        from PIL import Image
 
-    with Image.open(cutout_path) as car:
-        car = car.convert("RGBA")
-        bg = generate_background(bg_id, car.size)
-        params = RenderParams(rotate_deg=rotate, scale=scale, offset_x=x, offset_y=y, shadow=shadow, snap_center=snap)
-        out = render_composite(car, bg, params, paid=_paid(request))
-        data = encode_image(out, fmt)
+        size = _peek_cutout_size(cutout_path)
+        with Image.open(cutout_path) as car:
+            bg = generate_background(bg_id, size or car.size)
+            car = car.convert("RGBA")
+            out = render_composite(car, bg, params, paid=paid)
+            return encode_image(out, fmt)
 
+    data = cache.fetch(key, _produce)
     media = "image/png" if fmt.lower() == "png" else "image/jpeg"
     ext = "png" if fmt.lower() == "png" else "jpg"
     headers = {"Content-Disposition": f'attachment; filename="{image_id}.{ext}"'}
@@ -445,35 +690,105 @@ def render_zip(request: Request, body: ZipIn) -> StreamingResponse:
     db: Db = request.app.state.db
     paid = _paid(request)
 
-    from PIL import Image
-
-    # Spool to disk if zip grows large.
-    import tempfile
-
-    tmp = tempfile.SpooledTemporaryFile(max_size=50_000_000)
-    with zipfile.ZipFile(tmp, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for it in body.items:
-            cutout_path = _load_cutout(db, tok, it.image_id)
-            with Image.open(cutout_path) as car:
-                car = car.convert("RGBA")
-                bg = generate_background(it.bg_id, car.size)
-                params = RenderParams(
-                    rotate_deg=it.rotate,
-                    scale=it.scale,
-                    offset_x=it.x,
-                    offset_y=it.y,
-                    shadow=it.shadow,
-                    snap_center=it.snap,
-                )
-                out = render_composite(car, bg, params, paid=paid)
-                data = encode_image(out, body.fmt)
+    # Reject unknown backgrounds here, while a clean 400 is still possible;
+    # once the streaming response has sent its 200 header there is no way
+    # to signal an error to the client.
+    bad = sorted({it.bg_id for it in body.items if not known_background(it.bg_id)})
+    if bad:
+        raise HTTPException(status_code=400, detail=f"Unknown background id(s): {', '.join(bad)}")
+
+    # Resolve cutout paths serially (keeps DB access on this thread), then
+    # fan the CPU-heavy renders out to the worker pool. ZipFile.writestr is
+    # not thread-safe, so writes happen here as renders complete.
+    items = [(it, _load_cutout(db, tok, it.image_id)) for it in body.items]
+    ext = "png" if body.fmt.lower() == "png" else "jpg"
+
+    executor = request.app.state.executor
+    futures = {
+        executor.submit(_render_zip_item, cutout_path, it, body.fmt, paid): f"{it.image_id}.{ext}"
+        for it, cutout_path in items
+    }
 
-            ext = "png" if body.fmt.lower() == "png" else "jpg"
-            zf.writestr(f"{it.image_id}.{ext}", data)
+    # JPEG/PNG entries are already entropy-coded; deflating them burns zlib
+    # CPU for <1% size gain, so store them raw.
+    comp = zipfile.ZIP_STORED if body.fmt.lower() in ("jpg", "jpeg", "png") else zipfile.ZIP_DEFLATED
 
-    tmp.seek(0)
     headers = {"Content-Disposition": 'attachment; filename="zhaku_processed.zip"'}
-    return StreamingResponse(tmp, media_type="application/zip", headers=headers)
+    return StreamingResponse(_zip_stream(futures, comp), media_type="application/zip", headers=headers)
+
+
+class _ZipBuffer(io.RawIOBase):
+    """Append-only sink for ZipFile whose bytes can be drained incrementally.
+
+    Not seekable on purpose: zipfile then writes data descriptors instead of
+    seeking back to patch headers, which is what makes streaming possible.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:  # type: ignore[override]
+        self._chunks.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        chunks, self._chunks = self._chunks, []
+        return b"".join(chunks)
+
+
+def _zip_stream(futures: dict[Any, str], compression: int = zipfile.ZIP_STORED):
+    """Yield zip bytes as each rendered entry lands — first bytes reach the
+    client after the first render instead of after the whole archive."""
+    buf = _ZipBuffer()
+    try:
+        with zipfile.ZipFile(buf, mode="w", compression=compression, compresslevel=1) as zf:
+            for fut in as_completed(futures):
+                name = futures[fut]
+                try:
+                    data = fut.result()
+                except Exception as e:
+                    # The 200 header is already gone, so raising here would
+                    # truncate the archive mid-stream. Note the failure as a
+                    # text entry and keep the remaining items intact.
+                    zf.writestr(f"{name}.error.txt", f"render failed: {e}\n")
+                    yield buf.drain()
+                    continue
+                zf.writestr(name, data)
+                yield buf.drain()
+        # Central directory written on close.
+        yield buf.drain()
+    finally:
+        # Covers early generator close (client disconnect): don't leave
+        # unstarted renders occupying the pool. cancel() on done futures
+        # is a no-op.
+        for fut in futures:
+            fut.cancel()
+
+
+def _render_zip_item(cutout_path: Path, it: ZipItem, fmt: str, paid: bool) -> bytes:
+    from PIL import Image
+
+    with Image.open(cutout_path) as car:
+        car = car.convert("RGBA")
+        bg = generate_background(it.bg_id, car.size)
+        params = RenderParams(
+            rotate_deg=it.rotate,
+            scale=it.scale,
+            offset_x=it.x,
+            offset_y=it.y,
+            shadow=it.shadow,
+            snap_center=it.snap,
+        )
+        out = render_composite(car, bg, params, paid=paid)
+        return encode_image(out, fmt)
 
 
 class CheckoutOut(BaseModel):
@@ -481,25 +796,28 @@ class CheckoutOut(BaseModel):
 
 
 @app.post("/api/stripe/create-checkout", response_model=CheckoutOut)
-def stripe_create_checkout(request: Request) -> Any:
+async def stripe_create_checkout(request: Request) -> Any:
     tok = _client_token(request)
     if not tok:
         raise HTTPException(status_code=401, detail="Missing client token")
     try:
-        url = create_checkout_session(tok)
+        # The Stripe SDK call is a blocking HTTPS round-trip; run it on a
+        # thread so it doesn't occupy the event loop (or, as a sync endpoint
+        # would, pin one of uvicorn's threadpool workers per redirect burst).
+        url = await asyncio.to_thread(create_checkout_session, tok)
         return {"url": url}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.get("/api/stripe/checkout-status")
-def stripe_checkout_status(request: Request, session_id: str) -> dict[str, Any]:
+async def stripe_checkout_status(request: Request, session_id: str) -> dict[str, Any]:
     db: Db = request.app.state.db
     tok = _client_token(request)
     if not tok:
         raise HTTPException(status_code=401, detail="Missing client token")
     try:
-        info = sync_payment_from_session(db, session_id=session_id)
+        info = await asyncio.to_thread(sync_payment_from_session, db, session_id=session_id)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     # If the session belongs to a different token, do not flip this browser.
@@ -514,7 +832,9 @@ async def stripe_webhook(request: Request) -> Response:
     payload = await request.body()
     sig = request.headers.get("stripe-signature")
     try:
-        handle_webhook(db, payload=payload, sig_header=sig)
+        # Signature check is cheap, but webhook handling can hit Stripe; keep
+        # it off the event loop like the other Stripe endpoints.
+        await asyncio.to_thread(handle_webhook, db, payload=payload, sig_header=sig)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     return Response(content=b"ok", media_type="text/plain")
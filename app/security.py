@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import base64
-import hashlib
 import hmac
 import json
 import time
+from functools import lru_cache
 from typing import Any
 
 
+@lru_cache(maxsize=4)
+def _secret_bytes(secret: str) -> bytes:
+    return secret.encode("utf-8")
+
+
 def _b64u_encode(data: bytes) -> str:
     return base64.urlsafe_b64encode(data).decode("utf-8").rstrip("=")
 
@@ -21,7 +26,8 @@ def sign_dict(payload: dict[str, Any], secret: str, ttl_seconds: int) -> str:
     now = int(time.time())
     body = {"iat": now, "exp": now + ttl_seconds, "p": payload}
     raw = json.dumps(body, separators=(",", ":"), sort_keys=True).encode("utf-8")
-    sig = hmac.new(secret.encode("utf-8"), raw, hashlib.sha256).digest()
+    # hmac.digest is the one-shot C fast path (no HMAC object construction).
+    sig = hmac.digest(_secret_bytes(secret), raw, "sha256")
     return f"{_b64u_encode(raw)}.{_b64u_encode(sig)}"
 
 
@@ -30,7 +36,7 @@ def verify_signed_dict(token: str, secret: str) -> dict[str, Any] | None:
         raw_b64, sig_b64 = token.split(".", 1)
         raw = _b64u_decode(raw_b64)
         sig = _b64u_decode(sig_b64)
-        expected = hmac.new(secret.encode("utf-8"), raw, hashlib.sha256).digest()
+        expected = hmac.digest(_secret_bytes(secret), raw, "sha256")
         if not hmac.compare_digest(sig, expected):
             return None
         body = json.loads(raw.decode("utf-8"))
@@ -22,9 +22,20 @@ def cutouts_dir() -> Path:
     return data_dir() / "cutout"
 
 
+# Map every disallowed ASCII codepoint to "_" in one C-level translate pass.
+_ALLOWED_CHARS = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._-")
+_TRANSLATE = {i: (chr(i) if chr(i) in _ALLOWED_CHARS else "_") for i in range(128)}
+
+
 def safe_filename(name: str) -> str:
-    name = name.strip().replace("\\", "_").replace("/", "_")
-    name = re.sub(r"[^a-zA-Z0-9._-]+", "_", name)
+    name = name.strip()
+    if name.isascii():
+        name = name.translate(_TRANSLATE)
+    else:
+        name = name.replace("\\", "_").replace("/", "_")
+        name = re.sub(r"[^a-zA-Z0-9._-]+", "_", name)
+    while "__" in name:
+        name = name.replace("__", "_")
     return name[:120] or "upload"
 
 
@@ -16,6 +16,10 @@ def stripe_configured() -> bool:
 
 def _init_stripe() -> None:
     stripe.api_key = settings.STRIPE_SECRET_KEY
+    if stripe.default_http_client is None:
+        # Bounded timeout so a hung Stripe connection can't pin a worker
+        # thread indefinitely (the SDK default is 80s).
+        stripe.default_http_client = stripe.http_client.new_default_http_client(timeout=10)
 
 
 def create_checkout_session(client_token: str) -> str:
@@ -86,7 +90,7 @@ def sync_payment_from_session(db: Db, session_id: str) -> dict[str, Any]:
         payment_intent = sess.get("payment_intent") or {}
         pi_id = payment_intent.get("id")
         db.set_paid(client_token, stripe_customer_id=(sess.get("customer") or None))
-        with db.connect() as conn:
+        with db.write() as conn:
             conn.execute(
                 """
                 INSERT OR REPLACE INTO payments(
@@ -105,7 +109,6 @@ def sync_payment_from_session(db: Db, session_id: str) -> dict[str, Any]:
                     int(time.time()),
                 ),
             )
-            conn.commit()
         db.log("info", "payment.paid", f"client={client_token} session={session_id} amount_total={amount_total} {currency}")
 
     return out
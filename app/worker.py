@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import hashlib
 import io
+import os
 import threading
 import traceback
 from pathlib import Path
@@ -20,20 +22,37 @@ def _get_session() -> object:
 
     On small containers, loading/downloading the model at startup can get the process killed.
     """
-    # Import rembg lazily so the app can boot even on small containers.
-    # (OpenCV + rembg import can be heavy and may fail if system libs are missing.)
-    from rembg import new_session
-
     global _session, _session_model
+
+    # Double-checked locking: lock-free fast path once loaded.
     if _session is not None and _session_model == settings.RMBG_MODEL:
         return _session
     with _session_lock:
         if _session is None or _session_model != settings.RMBG_MODEL:
+            # Import rembg lazily so the app can boot even on small containers.
+            # (OpenCV + rembg import can be heavy and may fail if system libs are missing.)
+            from rembg import new_session
+
             _session = new_session(settings.RMBG_MODEL)
             _session_model = settings.RMBG_MODEL
         return _session
 
 
+def preload_session() -> object:
+    """Eagerly build the shared rembg session (used behind PRELOAD_MODEL)."""
+    return _get_session()
+
+
+_PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def png_size(data: bytes) -> tuple[int, int] | None:
+    """Read width/height from the PNG IHDR (bytes 16..24) without decoding."""
+    if len(data) < 24 or not data.startswith(_PNG_MAGIC):
+        return None
+    return int.from_bytes(data[16:20], "big"), int.from_bytes(data[20:24], "big")
+
+
 def remove_background_to_file(
     *,
     original_path: Path,
@@ -43,19 +62,50 @@ def remove_background_to_file(
     on_success: Callable[[int, int], None],
 ) -> None:
     try:
-        # Import lazily to avoid crashing the web server during startup.
-        from rembg import remove
-
-        if session is None:
-            session = _get_session()
         raw = original_path.read_bytes()
-        out = remove(raw, session=session)  # returns PNG bytes with alpha
         cutout_path.parent.mkdir(parents=True, exist_ok=True)
-        cutout_path.write_bytes(out)
 
-        with Image.open(io.BytesIO(out)) as im:
-            im = im.convert("RGBA")
-            on_success(im.width, im.height)
+        # Content-addressed cache: identical bytes re-uploaded (or retried)
+        # skip the ONNX model entirely and reuse the previous cutout.
+        cache_path = cutout_path.parent / f"_cache_{hashlib.sha256(raw).hexdigest()}.png"
+        size: tuple[int, int] | None = None
+        if cache_path.exists():
+            with open(cache_path, "rb") as f:
+                size = png_size(f.read(26))
+        else:
+            # Import lazily to avoid crashing the web server during startup.
+            from rembg import remove
+
+            if session is None:
+                session = _get_session()
+            # Hand rembg a PIL image so it returns one instead of PNG bytes:
+            # its internal encode runs at max zlib level, which is a big
+            # slice of per-image CPU. The cutout is an intermediate artifact,
+            # so a light compress_level is plenty.
+            with Image.open(io.BytesIO(raw)) as src:
+                pil = remove(src, session=session)
+            # Write via a temp name + atomic rename: a crash/OOM-kill
+            # mid-save must not leave a truncated file under the content
+            # hash, or every future upload of the same bytes would reuse
+            # the poisoned cache entry.
+            tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+            pil.save(tmp_path, format="PNG", compress_level=1, optimize=False)
+            os.replace(tmp_path, cache_path)
+            size = pil.size
+
+        try:
+            # Hardlink when possible (same filesystem) to avoid a second copy.
+            if cutout_path.exists():
+                cutout_path.unlink()
+            os.link(cache_path, cutout_path)
+        except OSError:
+            cutout_path.write_bytes(cache_path.read_bytes())
+
+        if size is None:
+            # Unexpected cache contents; fall back to a real decode.
+            with Image.open(cutout_path) as im:
+                size = (im.width, im.height)
+        on_success(*size)
     except Exception as e:
         detail = f"{e}\n{traceback.format_exc(limit=6)}"
         on_error(detail)